@@ -2,6 +2,13 @@ from abc import ABC, abstractmethod
 import json
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+# Shared keep-alive session so that status checks reuse pooled
+# connections to the triton server instead of a new handshake each call.
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
 
 class BaseModelClass:
 
@@ -27,9 +34,9 @@ class BaseModelClass:
         '''
         triton_server_url = f'http://{self._url}/v2/repository/index'
         try:
-            response = requests.post(triton_server_url)
+            response = _SESSION.post(triton_server_url, timeout=1.0)
             body = json.loads(response.text)
-        except ConnectionError:
+        except (ConnectionError, RequestException):
             return {'status': 'Inactive'}
         
         model = list(filter(lambda model: model['name'] == self._model_name, body))
@@ -42,6 +49,21 @@ class BaseModelClass:
         else:
             return {'status': 'Model not found'}   
 
+
+    @staticmethod
+    def _count_files(path, cap=256):
+        '''
+        Returns the number of files in a directory, counting
+        at most up to cap entries.
+        '''
+        n = 0
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_file():
+                    n += 1
+                    if n >= cap:
+                        return n
+        return n
     
     @abstractmethod
     def predict(self):
@@ -52,8 +52,7 @@ class BodyPoseNetClass(BaseModelClass):
             raise FileNotFoundError("File Path does not exist!")
 
     def _predict(self, file_path, return_tensor):
-        number_files = len([name for name in os.listdir(
-            file_path) if os.path.isfile(file_path+name)])
+        number_files = self._count_files(file_path)
         if number_files < 256:
             self._batch_size = 8
         else:
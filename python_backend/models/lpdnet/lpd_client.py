@@ -20,11 +20,13 @@
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from functools import partial
 import logging
 import os
 import sys
+import threading
 
 from attrdict import AttrDict
 import numpy as np
@@ -47,6 +49,11 @@ from tao_triton.python.model.classification_model import ClassificationModel
 
 logger = logging.getLogger(__name__)
 
+# Per thread cache of the InferInput/InferRequestedOutput objects, keyed by
+# protocol, tensor names, shape and dtype. A request is serialized when it is
+# sent, so the same objects can be refilled for every batch of a given shape.
+_INFER_CACHE = threading.local()
+
 TRITON_MODEL_DICT = {
     "detectnet_v2": DetectnetModel,
 }
@@ -69,6 +76,21 @@ def convert_http_metadata_config(_metadata, _config):
     return _model_metadata, _model_config
 
 
+def load_frame(frame, triton_model):
+    """Decode, resize and preprocess a single frame for inference."""
+    return triton_model.preprocess(
+        frame.as_numpy(frame.load_image())
+    )
+
+
+def submit_batch(pool, frames, start_idx, batch_size, triton_model):
+    """Queue the frames of a batch for loading and return their futures."""
+    return [
+        pool.submit(load_frame, frames[(start_idx + idx) % len(frames)], triton_model)
+        for idx in range(batch_size)
+    ]
+
+
 def requestGenerator(batched_image_data, input_name, output_name, dtype, protocol,
                      num_classes=0):
     """Generator for triton inference requests.
@@ -91,16 +113,25 @@ def requestGenerator(batched_image_data, input_name, output_name, dtype, protoco
     else:
         client = httpclient
 
+    cache = getattr(_INFER_CACHE, "requests", None)
+    if cache is None:
+        cache = _INFER_CACHE.requests = {}
+    key = (protocol, input_name, tuple(output_name), batched_image_data.shape,
+           dtype, num_classes)
+    if key not in cache:
+        cache[key] = (
+            [client.InferInput(input_name, batched_image_data.shape, dtype)],
+            [
+                client.InferRequestedOutput(
+                    out_name, class_count=num_classes
+                ) for out_name in output_name
+            ]
+        )
+    inputs, outputs = cache[key]
+
     # Set the input data
-    inputs = [client.InferInput(input_name, batched_image_data.shape, dtype)]
     inputs[0].set_data_from_numpy(batched_image_data)
 
-    outputs = [
-        client.InferRequestedOutput(
-            out_name, class_count=num_classes
-        ) for out_name in output_name
-    ]
-
     yield inputs, outputs
 
 def lpd_predict(**FLAGS):
@@ -221,22 +252,22 @@ def lpd_predict(**FLAGS):
     final_response = []
 
     logger.info("Sending inference request for batches of data")
-    with tqdm(total=len(frames)) as pbar:
+    # Images of a batch are decoded concurrently (PIL releases the GIL while
+    # decoding and resizing) and sent to the server as a single request.
+    # The next batch is decoded while the current one is being sent, so
+    # image loading overlaps with the inference requests.
+    with ThreadPoolExecutor(max_workers=2 * FLAGS['batch_size']) as pool, \
+            tqdm(total=len(frames)) as pbar:
+        pending = submit_batch(pool, frames, image_idx, FLAGS['batch_size'], triton_model)
         while not last_request:
             input_filenames = []
-            repeated_image_data = []
-
-            for idx in range(FLAGS['batch_size']):
-                frame = frames[image_idx]
-                img = frame.load_image()
-                repeated_image_data.append(
-                    triton_model.preprocess(
-                        frame.as_numpy(img)
-                    )
+            last_request = image_idx + FLAGS['batch_size'] >= len(frames)
+            image_idx = (image_idx + FLAGS['batch_size']) % len(frames)
+            repeated_image_data = [future.result() for future in pending]
+            if not last_request:
+                pending = submit_batch(
+                    pool, frames, image_idx, FLAGS['batch_size'], triton_model
                 )
-                image_idx = (image_idx + 1) % len(frames)
-                if image_idx == 0:
-                    last_request = True
 
             if max_batch_size > 0:
                 batched_image_data = np.stack(repeated_image_data, axis=0)
@@ -277,7 +308,9 @@ def lpd_predict(**FLAGS):
                                     inputs,
                                     request_id=str(sent_count),
                                     model_version=FLAGS['model_version'],
-                                    outputs=outputs))
+                                    outputs=outputs,
+                                    # Avoid the gzip negotiation latency of async HTTP.
+                                    headers={"Accept-Encoding": ""}))
                     else:
                         responses.append(
                             triton_client.infer(FLAGS['model_name'],
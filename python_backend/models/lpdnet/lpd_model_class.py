@@ -15,6 +15,7 @@ class LpdModelClass(BaseModelClass):
         '''
         url = os.environ.get('API_URL')
         BaseModelClass.__init__(self, client_info, url, model_name)
+        self._grpc_url = os.environ.get('GRPC_API_URL')
         self._post_processing_config = "/app/triton_client/tao_triton/python/clustering_specs/clustering_config_lpdnet.prototxt"
         self._mode = "DetectNet_v2"
         self._class_list = "license_plate"
@@ -43,16 +44,21 @@ class LpdModelClass(BaseModelClass):
             raise FileNotFoundError("File Path does not exist!")
 
     def _predict(self, file_path):
-        number_files = len([name for name in os.listdir(
-            file_path) if os.path.isfile(file_path+name)])
+        number_files = self._count_files(file_path)
         if number_files < 256:
             self._batch_size = 8
         else:
             self._batch_size = 16
+        if self._grpc_url:
+            # Stream the batches over gRPC so that every request is in
+            # flight at once instead of queueing behind HTTP uploads.
+            url, protocol, streaming = self._grpc_url, 'gRPC', True
+        else:
+            url, protocol, streaming = self._url, 'HTTP', False
         return lpd_predict(model_name=self._model_name, mode=self._mode, class_list=self._class_list,
                            output_path="./", postprocessing_config=self._post_processing_config,
-                           url=self._url, image_filename=file_path, verbose=False, streaming=False, async_set=True,
-                           protocol='HTTP', model_version="", batch_size=self._batch_size)
+                           url=url, image_filename=file_path, verbose=False, streaming=streaming, async_set=True,
+                           protocol=protocol, model_version="", batch_size=self._batch_size)
 
 # To handle output_path
 if __name__ == "__main__":
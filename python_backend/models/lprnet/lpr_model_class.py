@@ -49,8 +49,7 @@ class LprModelClass(BaseModelClass):
                      'error': "File Path does not exist!"}]
 
     def _predict(self, file_path):
-        number_files = len([name for name in os.listdir(
-            file_path) if os.path.isfile(file_path+name)])
+        number_files = self._count_files(file_path)
         print(number_files)
         if number_files < 256:
             self._batch_size = 8
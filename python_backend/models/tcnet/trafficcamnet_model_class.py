@@ -17,6 +17,7 @@ class TrafficCamNetModelClass(BaseModelClass):
         '''
         url = os.environ.get('API_URL')
         BaseModelClass.__init__(self, client_info, url, model_name)
+        self._grpc_url = os.environ.get('GRPC_API_URL')
         self._post_processing_config = "/app/triton_client/tao_triton/python/clustering_specs/clustering_config_trafficcamnet.prototxt"
         self._mode = "trafficcamnet"
         self._class_list = "car,bicycle,person,road_sign"
@@ -45,23 +46,35 @@ class TrafficCamNetModelClass(BaseModelClass):
             raise FileNotFoundError("File Path does not exist!")
 
     def _predict(self, file_path):
-        number_files = len([name for name in os.listdir(
-            file_path) if os.path.isfile(file_path+name)])
+        number_files = self._count_files(file_path)
         if number_files < 256:
             self._batch_size = 8
         else:
             self._batch_size = 16
+        if self._grpc_url:
+            # Stream the batches over gRPC so that every request is in
+            # flight at once instead of queueing behind HTTP uploads.
+            url, protocol, streaming = self._grpc_url, 'gRPC', True
+        else:
+            url, protocol, streaming = self._url, 'HTTP', False
         return trafficcamnet_predict(model_name=self._model_name, mode=self._mode, class_list=self._class_list,
                            output_path="./", postprocessing_config=self._post_processing_config,
-                           url=self._url, image_filename=file_path, verbose=False, streaming=False, async_set=True,
-                           protocol='HTTP', model_version="", batch_size=self._batch_size)
+                           url=url, image_filename=file_path, verbose=False, streaming=streaming, async_set=True,
+                           protocol=protocol, model_version="", batch_size=self._batch_size)
 
 # To handle output_path
 if __name__ == "__main__":
-    test_model = TrafficCamNetModelClass("hellosss")
+    test_model = TrafficCamNetModelClass("hellosss", "trafficcamnet")
     # print(test_model.status())
     res = test_model.predict("../input/lpd")
 
-    import pickle
-    with open('output.pickle', 'wb') as handle:
-        pickle.dump(res, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    # Save the bboxes as a single (n, 6) matrix of
+    # [x1, y1, x2, y2, confidence_score, image_idx] with the file names.
+    import numpy as np
+    all_bboxes = np.array([
+        bbox_info['bbox'] + [bbox_info['confidence_score'], image_idx]
+        for image_idx, info in enumerate(res)
+        for bbox_info in info['all_bboxes']
+    ], dtype=np.float64).reshape(-1, 6)
+    names = np.array([info['file_name'] for info in res])
+    np.savez_compressed('output.npz', bboxes=all_bboxes, filenames=names)
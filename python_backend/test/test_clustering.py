@@ -0,0 +1,187 @@
+# Unit tests of the DBSCAN postprocessing, no running containers required
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.cluster import DBSCAN
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "triton_client"))
+pytest.importorskip("tritonclient.grpc")
+import tritonclient.grpc.model_config_pb2 as mc
+from tao_triton.python.types import Frame
+from tao_triton.python.postprocessing.utils import (
+    SPARSE_CANDIDATES,
+    _dbscan_1d_labels,
+    dbscan_labels,
+    denormalize_bounding_bboxes,
+    extract_class_bboxes,
+    iou_vectorized,
+    thresholded_indices
+)
+
+# eps and min_samples of the shipped clustering specs. sklearn >= 1.2 rejects
+# a fractional min_samples, so the 0.05 is scaled to 1 together with the
+# coverage weights, which leaves the clustering unchanged
+EPS = 0.3
+COV_SCALE = 20
+MIN_SAMPLES = 1
+
+
+def jittered(box, count, seed):
+    """Candidate bboxes of one object, as neighbouring grid cells predict them."""
+    rng = np.random.RandomState(seed)
+    return np.asarray(box, dtype=np.float64) + rng.uniform(-1.0, 1.0, size=(count, 4))
+
+
+def random_scene(seed, num_objects, per_object):
+    """Candidates of objects of random size and position with scaled coverages."""
+    rng = np.random.RandomState(seed)
+    bboxes = []
+    for _ in range(num_objects):
+        left, top = rng.uniform(0, 600, size=2)
+        width, height = rng.uniform(20, 300, size=2)
+        # Candidates spread by up to 10% of the object size
+        spread = rng.uniform(-0.1, 0.1, size=(per_object, 4)) * [width, height, width, height]
+        bboxes.append([left, top, left + width, top + height] + spread)
+    bboxes = np.concatenate(bboxes)
+    covs = rng.uniform(0.005, 1.0, size=bboxes.shape[0]) * COV_SCALE
+    return bboxes, covs.astype(np.float32)
+
+
+def baseline_labels(bboxes, covs):
+    """Per image clustering of the original postprocessor."""
+    pairwise_dist = 1.0 * (1.0 - iou_vectorized(bboxes))
+    return DBSCAN(eps=EPS, min_samples=MIN_SAMPLES).fit_predict(
+        X=pairwise_dist, sample_weight=covs
+    )
+
+
+def assert_same_partition(labeling, expected):
+    assert np.array_equal(labeling < 0, expected < 0)
+    assert np.array_equal(
+        labeling[:, None] == labeling[None, :],
+        expected[:, None] == expected[None, :]
+    )
+
+
+def mixed_size_scene():
+    # Two small 40x25 cars 25px apart (IOU ~0.2) and one large 400x300 car
+    bboxes = np.concatenate([
+        jittered([100, 100, 140, 125], 8, 0),
+        jittered([125, 100, 165, 125], 8, 1),
+        jittered([300, 200, 700, 500], 8, 2),
+    ])
+    covs = np.full((bboxes.shape[0],), 0.5, dtype=np.float32)
+    return bboxes, covs
+
+
+def test_mixed_size_objects_are_not_merged():
+    bboxes, covs = mixed_size_scene()
+    labeling = dbscan_labels(bboxes, covs, EPS, MIN_SAMPLES)
+    assert len(set(labeling[:8])) == 1
+    assert len(set(labeling[8:16])) == 1
+    assert len(set(labeling[16:])) == 1
+    assert len(set(labeling[[0, 8, 16]])) == 3
+    assert np.all(labeling >= 0)
+
+
+def test_groups_are_clustered_independently():
+    bboxes, covs = mixed_size_scene()
+    groups = np.repeat([0, 1], bboxes.shape[0])
+    labeling = dbscan_labels(
+        np.concatenate([bboxes, bboxes]), np.concatenate([covs, covs]),
+        EPS, MIN_SAMPLES, groups=groups
+    )
+    alone = dbscan_labels(bboxes, covs, EPS, MIN_SAMPLES)
+    assert len(np.unique(labeling)) == 2 * len(np.unique(alone))
+    assert not set(labeling[groups == 0]) & set(labeling[groups == 1])
+
+
+def test_batch_matches_baseline_per_image():
+    scenes = [random_scene(seed, 4, 5) for seed in range(8)]
+    bboxes = np.concatenate([b for b, _ in scenes])
+    covs = np.concatenate([c for _, c in scenes])
+    groups = np.repeat(np.arange(len(scenes)), [c.size for _, c in scenes])
+    labeling = dbscan_labels(bboxes, covs, EPS, MIN_SAMPLES, groups=groups)
+    for group, (scene_bboxes, scene_covs) in enumerate(scenes):
+        assert_same_partition(
+            labeling[groups == group], baseline_labels(scene_bboxes, scene_covs)
+        )
+
+
+def test_1d_clustering_falls_back_per_image():
+    pytest.importorskip("dbscan1d")
+    # Image 0 has two plates side by side, image 1 two stacked plates that
+    # share their x-center and can only be told apart in y
+    bboxes = np.concatenate([
+        jittered([100, 100, 180, 120], 8, 0),
+        jittered([300, 100, 380, 120], 8, 1),
+        jittered([100, 100, 180, 120], 8, 2),
+        jittered([100, 200, 180, 220], 8, 3),
+    ])
+    covs = np.full((bboxes.shape[0],), 0.5, dtype=np.float32)
+    groups = np.repeat([0, 1], 16)
+    labeling = dbscan_labels(
+        bboxes, covs, EPS, MIN_SAMPLES, groups=groups, use_1d=True
+    )
+    for plate in range(4):
+        assert len(set(labeling[8 * plate:8 * plate + 8])) == 1
+    assert len(set(labeling[::8])) == 4
+    # Only the stacked plates are left to the IOU clustering
+    _, pending = _dbscan_1d_labels(bboxes, covs, EPS, MIN_SAMPLES, groups)
+    assert np.array_equal(pending, groups == 1)
+
+
+def test_small_inputs_match_sklearn():
+    # Three 100 wide bboxes 15px apart chain into one cluster
+    chain = np.array([
+        [0, 0, 100, 50], [15, 0, 115, 50], [30, 0, 130, 50]
+    ], dtype=np.float64)
+    chain_covs = np.array([0.9, 0.5, 0.5], dtype=np.float32) * COV_SCALE
+    scenes = [(chain, chain_covs)] + [random_scene(seed, 3, 4) for seed in range(20)]
+    for bboxes, covs in scenes:
+        assert bboxes.shape[0] < SPARSE_CANDIDATES
+        assert np.array_equal(
+            dbscan_labels(bboxes, covs, EPS, MIN_SAMPLES),
+            baseline_labels(bboxes, covs)
+        )
+
+
+@pytest.mark.parametrize("data_format, target_shape", [
+    (mc.ModelInput.FORMAT_NCHW, (3, 544, 960)),
+    (mc.ModelInput.FORMAT_NHWC, (544, 960, 3)),
+])
+def test_extract_class_bboxes_matches_denormalize_and_threshold(data_format, target_shape):
+    classes = ["car", "person"]
+    cov_threshold = {"car": 0.3, "person": 0.6}
+    stride, offset, bbox_norm = 16, 0.5, [35., 35]
+    frames = []
+    for width, height in [(1920, 1080), (640, 480), (960, 544), (300, 700)]:
+        frame = Frame("unused.jpg", data_format, np.float32, target_shape)
+        frame.width, frame.height = width, height
+        frames.append(frame)
+    # Outputs as apply() sees them after the transpose, on a 60 x 34 grid
+    rng = np.random.RandomState(0)
+    covs = rng.rand(len(frames), len(classes), 60, 34).astype(np.float32)
+    bboxes = rng.randn(len(frames), 4 * len(classes), 60, 34).astype(np.float32)
+
+    abs_bbox = denormalize_bounding_bboxes(
+        bboxes, stride, offset, bbox_norm, len(classes), 1, 1,
+        data_format, target_shape, frames, 0
+    )
+    valid_indices = thresholded_indices(covs, len(classes), classes, cov_threshold)
+    for image_idx, frame in enumerate(frames):
+        for class_idx, class_name in enumerate(classes):
+            fused_covs, fused_bboxes = extract_class_bboxes(
+                covs[image_idx], bboxes[image_idx], class_idx,
+                cov_threshold[class_name], stride, offset, bbox_norm, 1, 1,
+                data_format, target_shape, frame
+            )
+            indices = valid_indices[image_idx][class_idx]
+            np.testing.assert_array_equal(
+                fused_covs, covs[image_idx, class_idx].flatten()[indices]
+            )
+            expected = abs_bbox[image_idx, 4*class_idx:4*class_idx+4]
+            expected = expected.reshape(4, -1).T[indices]
+            np.testing.assert_allclose(fused_bboxes, expected, rtol=1e-5, atol=1e-3)
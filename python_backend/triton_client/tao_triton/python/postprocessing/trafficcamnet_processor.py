@@ -21,36 +21,44 @@
 
 """Simple class to run post processing of Detectnet-v2 Triton Inference outputs."""
 
+import functools
+import logging
 import os
 
 import numpy as np
-from sklearn.cluster import DBSCAN as dbscan
 from google.protobuf.text_format import Merge as merge_text_proto
 
 from tao_triton.python.postprocessing.postprocessor import Postprocessor
 import tao_triton.python.proto.postprocessor_config_pb2 as postprocessor_config_pb2
 from tao_triton.python.types import KittiBbox
 from tao_triton.python.postprocessing.utils import (
-    denormalize_bounding_bboxes,
-    iou_vectorized,
-    pool_context,
+    DBSCAN1D,
+    cluster_statistics,
+    dbscan_labels,
+    extract_class_bboxes,
     render_image,
-    thresholded_indices,
     return_bbox_info
 )
 from tao_triton.python.utils.kitti import write_kitti_annotation
 from PIL import Image
 
-def load_clustering_config(config):
-    """Load the clustering config."""
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_clustering_config(config, mtime):
+    """Parse the clustering config, cached per path and modification time."""
     proto = postprocessor_config_pb2.PostprocessingConfig()
-    def _load_from_file(filename, pb2):
-        if not os.path.exists(filename):
-            raise IOError("Specfile not found at: {}".format(filename))
-        with open(filename, "r") as f:
-            merge_text_proto(f.read(), pb2)
-    _load_from_file(config, proto)
+    with open(config, "r") as f:
+        merge_text_proto(f.read(), proto)
     return proto
+
+
+def load_clustering_config(config):
+    """Load the clustering config."""
+    if not os.path.exists(config):
+        raise IOError("Specfile not found at: {}".format(config))
+    return _parse_clustering_config(config, os.path.getmtime(config))
     
 
 class TrafficCamNetPostprocessor(Postprocessor):
@@ -88,21 +96,39 @@ class TrafficCamNetPostprocessor(Postprocessor):
 
     def configure(self):
         """Configure the post processor object."""
-        self.dbscan_elements = {}
-        self.coverage_thresholds = {}
-        self.box_color = {}
         classwise_clustering_config = self.pproc_config.classwise_clustering_config
-        for class_name in self.classes:
-            if class_name not in classwise_clustering_config.keys():
-                raise KeyError("Cannot find class name {} in {}".format(
-                    class_name, self.pproc_config.keys()
-                ))
-            self.dbscan_elements[class_name] = dbscan(
-                eps=classwise_clustering_config[class_name].dbscan_config.dbscan_eps,
-                min_samples=classwise_clustering_config[class_name].dbscan_config.dbscan_min_samples,
+        missing = set(self.classes) - set(classwise_clustering_config.keys())
+        if missing:
+            raise KeyError("Cannot find class names {} in {}".format(
+                sorted(missing), sorted(classwise_clustering_config.keys())
+            ))
+        # Fetch every classwise sub config from the proto map only once.
+        self._cw = {c: classwise_clustering_config[c] for c in self.classes}
+        self._dbscan_params = {
+            c: (cfg.dbscan_config.dbscan_eps, cfg.dbscan_config.dbscan_min_samples)
+            for c, cfg in self._cw.items()
+        }
+        self.box_color = {c: cfg.bbox_color for c, cfg in self._cw.items()}
+        # Per class thresholds indexed by class_idx for the apply() hot loop.
+        self._cov_thr = np.array([
+            self._cw[c].coverage_threshold for c in self.classes
+        ], dtype=np.float32)
+        self._dbscan_conf_thr = np.array([
+            self._cw[c].dbscan_config.dbscan_confidence_threshold
+            for c in self.classes
+        ], dtype=np.float32)
+        self._min_h = np.array([
+            self._cw[c].minimum_bounding_box_height for c in self.classes
+        ], dtype=np.float32)
+        self._use_1d_clustering = np.array([
+            self._cw[c].dbscan_config.use_1d_clustering for c in self.classes
+        ], dtype=bool)
+        if DBSCAN1D is None and np.any(self._use_1d_clustering):
+            logger.warning(
+                "use_1d_clustering is set for %s, but the dbscan1d package is not "
+                "installed. Falling back to the IOU clustering.",
+                [c for c, use_1d in zip(self.classes, self._use_1d_clustering) if use_1d]
             )
-            self.coverage_thresholds[class_name] = classwise_clustering_config[class_name].coverage_threshold
-            self.box_color[class_name] = classwise_clustering_config[class_name].bbox_color
 
     def apply(self, results, this_id, render=True):
         """Apply the post processing to the outputs tensors.
@@ -126,90 +152,84 @@ class TrafficCamNetPostprocessor(Postprocessor):
         output_array = {}
         this_id = int(this_id)
         for output_name in self.output_names:
-            output_array[output_name] = results.as_numpy(output_name).transpose(0, 1, 3, 2)
+            # Materialize the transposed layout once so the per class slicing below
+            # reads contiguous memory. The dtype the server sent is kept as is, so
+            # an FP16 engine is thresholded in FP16 and FP32 is never downcast.
+            output_array[output_name] = np.ascontiguousarray(
+                results.as_numpy(output_name).transpose(0, 1, 3, 2)
+            )
         assert len(self.classes) == output_array["output_cov/Sigmoid"].shape[1], (
             "Number of classes {} != number of dimensions in the output_cov/Sigmoid: {}".format(
                 len(self.classes), output_array["output_cov/Sigmoid"].shape[1]
             )
         )
-        abs_bbox = denormalize_bounding_bboxes(
-            output_array["output_bbox/BiasAdd"], self.stride,
-            self.offset, self.bbox_norm, len(self.classes), self.scale_w,
-            self.scale_h, self.data_format, self.target_shape, self.frames,
-            this_id - 1
-        )
-        valid_indices = thresholded_indices(
-            output_array["output_cov/Sigmoid"], len(self.classes),
-            self.classes,
-            self.coverage_thresholds
-        )
-        batchwise_boxes = []
-        for image_idx, indices in enumerate(valid_indices):
-            covs = output_array["output_cov/Sigmoid"][image_idx, :, :, :]
-            bboxes = abs_bbox[image_idx, :, :, :]
-            imagewise_boxes = []
-            for class_idx in [0]:
-            # for class_idx in range(len(self.classes)):
-                clustered_boxes = []
-                cw_config = self.pproc_config.classwise_clustering_config[
-                    self.classes[class_idx]
-                ]
-                classwise_covs = covs[class_idx, :, :].flatten()
-                classwise_covs = classwise_covs[indices[class_idx]]
-                if classwise_covs.size == 0:
-                    continue
-                classwise_bboxes = bboxes[4*class_idx:4*class_idx+4, :, :]
-                classwise_bboxes = classwise_bboxes.reshape(
-                    classwise_bboxes.shape[:1] + (-1,)
-                ).T[indices[class_idx]]
-                pairwise_dist = \
-                    1.0 * (1.0 - iou_vectorized(classwise_bboxes))
-                labeling = self.dbscan_elements[self.classes[class_idx]].fit_predict(
-                    X=pairwise_dist,
-                    sample_weight=classwise_covs
+        covs = output_array["output_cov/Sigmoid"]
+        bboxes = output_array["output_bbox/BiasAdd"]
+        num_images = covs.shape[0]
+        batch_frames = [
+            self.frames[((this_id - 1) * num_images + image_idx) % len(self.frames)]
+            for image_idx in range(num_images)
+        ]
+        batchwise_boxes = [[] for _ in range(num_images)]
+        # Gather the candidates of every image of the batch per class and
+        # cluster them with one dbscan_labels() call.
+        for class_idx in [0]:
+        # for class_idx in range(len(self.classes)):
+            class_name = self.classes[class_idx]
+            extracted = [
+                extract_class_bboxes(
+                    covs[image_idx], bboxes[image_idx], class_idx,
+                    self._cov_thr[class_idx],
+                    self.stride, self.offset, self.bbox_norm,
+                    self.scale_w, self.scale_h, self.data_format,
+                    self.target_shape, batch_frames[image_idx]
+                )
+                for image_idx in range(num_images)
+            ]
+            classwise_covs = np.concatenate([c for c, _ in extracted])
+            if classwise_covs.size == 0:
+                continue
+            classwise_bboxes = np.concatenate([b for _, b in extracted])
+            image_ids = np.repeat(
+                np.arange(num_images), [c.size for c, _ in extracted]
+            )
+            eps, min_samples = self._dbscan_params[class_name]
+            labeling = dbscan_labels(
+                classwise_bboxes, classwise_covs, eps, min_samples,
+                groups=image_ids, use_1d=self._use_1d_clustering[class_idx]
+            )
+            aggregated_w, mean_bboxes, members = cluster_statistics(
+                labeling, classwise_covs, classwise_bboxes
+            )
+            mean_box_h = mean_bboxes[:, 3] - mean_bboxes[:, 1]
+            valid_boxes = np.logical_and(
+                aggregated_w > self._dbscan_conf_thr[class_idx],
+                mean_box_h > self._min_h[class_idx]
+            )
+            for mean_bbox, confidence, image_idx in zip(mean_bboxes[valid_boxes],
+                                                        aggregated_w[valid_boxes],
+                                                        image_ids[members[valid_boxes]]):
+                batchwise_boxes[image_idx].append(
+                    KittiBbox(
+                        class_name, 0, 0, 0,
+                        mean_bbox, 0, 0, 0, 0,
+                        0, 0, 0, confidence_score=np.float64(confidence)
+                    )
                 )
-                labels = np.unique(labeling[labeling >= 0])
-                for label in labels:
-                    w = classwise_covs[labeling == label]
-                    aggregated_w = np.sum(w)
-                    w_norm = w / aggregated_w
-                    n = len(w)
-                    w_max = np.max(w)
-                    w_min = np.min(w)
-                    b = classwise_bboxes[labeling == label]
-                    mean_bbox = np.sum((b.T*w_norm).T, axis=0)
-                    mean_bbox = np.array(mean_bbox, dtype='float64')
-
-                    # Compute coefficient of variation of the box coords
-                    mean_box_w = mean_bbox[2] - mean_bbox[0]
-                    mean_box_h = mean_bbox[3] - mean_bbox[1]
-                    bbox_area = mean_box_w * mean_box_h
-                    valid_box = aggregated_w > cw_config.dbscan_config.\
-                        dbscan_confidence_threshold and mean_box_h > cw_config.minimum_bounding_box_height
-                    if valid_box:
-                        clustered_boxes.append(
-                            KittiBbox(
-                                self.classes[class_idx], 0, 0, 0,
-                                mean_bbox, 0, 0, 0, 0,
-                                0, 0, 0, confidence_score=np.float64(aggregated_w)
-                            )
-                        )
-                    else:
-                        continue
-                imagewise_boxes.extend(clustered_boxes)
-            batchwise_boxes.append(imagewise_boxes)
 
         if render:
-            with pool_context(self.batch_size) as pool:
-                batch_boxes_output = []
-                for image_idx in range(self.batch_size):
-                    current_idx = (this_id - 1) * self.batch_size + image_idx
-                    if current_idx >= len(self.frames):
-                        break
-                    current_frame = self.frames[current_idx]
-                    filename = os.path.basename(current_frame._image_path)
-                    
-                    #Returns BBOX of all license plates in it
-                    final_bboxes = return_bbox_info(current_frame, batchwise_boxes[image_idx])
-                    batch_boxes_output.append([final_bboxes, filename])
-                return batch_boxes_output
+            # Collecting the bbox info is cheap, so it is done inline rather
+            # than paying for a worker pool per batch.
+            batch_boxes_output = []
+            base_idx = (this_id - 1) * self.batch_size
+            for image_idx in range(self.batch_size):
+                current_idx = base_idx + image_idx
+                if current_idx >= len(self.frames):
+                    break
+                current_frame = self.frames[current_idx]
+                filename = os.path.basename(current_frame._image_path)
+
+                #Returns BBOX of all license plates in it
+                final_bboxes = return_bbox_info(current_frame, batchwise_boxes[image_idx])
+                batch_boxes_output.append([final_bboxes, filename])
+            return batch_boxes_output
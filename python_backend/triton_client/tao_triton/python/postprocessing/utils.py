@@ -32,12 +32,28 @@ import cv2 as cv
 from sklearn.cluster import DBSCAN as dbscan
 from PIL import ImageDraw
 
+try:
+    # Optional sorted-array DBSCAN for one dimensional data.
+    from dbscan1d.core import DBSCAN1D
+except ImportError:
+    DBSCAN1D = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
 from tao_triton.python.types import KittiBbox
 from tao_triton.python.utils.kitti import write_kitti_annotation
 import tritonclient.grpc.model_config_pb2 as mc
 
 logger = logging.getLogger(__name__)
 
+# Below this many candidate bboxes in an image, dbscan_labels() clusters them
+# with small_dbscan_labels() instead of sklearn, whose setup cost dominates.
+SPARSE_CANDIDATES = 16
+
 
 @contextmanager
 def pool_context(*args, **kwargs):
@@ -121,6 +137,59 @@ def thresholded_indices(cov_array, num_classes, classes, cov_threshold):
     return valid_indices
 
 
+def extract_class_bboxes(
+    cov_array, bbox_array, class_idx, cov_threshold,
+    stride, offset, bbox_norm,
+    scale_w, scale_h,
+    data_format, model_shape, frame
+):
+    """
+    Threshold and denormalize the bboxes of a single class of one image.
+
+    This fuses thresholded_indices and denormalize_bounding_bboxes into one
+    pass: the coverage threshold is applied first, and only the grid cells
+    that survive it are gathered and converted to absolute coordinates.
+
+    Args:
+        cov_array (np.array) : coverage output of one image, shape (C, W, H)
+        bbox_array (np.array) : bbox output of one image, shape (4 * C, W, H)
+        class_idx (int) : index of the class to extract
+        cov_threshold (float) : coverage threshold of the class
+        frame (Frame) : input frame the outputs belong to
+    Returns::
+        covs (np.array) : numpy array of shape (N,) of the surviving coverage values
+        bboxes (np.array) : numpy array of shape (N, 4) of absolute bboxes in LTRB format
+    """
+    if data_format == mc.ModelInput.FORMAT_NCHW:
+        _, model_height, model_width = model_shape
+    else:
+        model_height, model_width, _ = model_shape
+    grid_h = cov_array.shape[-1]
+    covs = cov_array[class_idx].reshape(-1)
+    # Compare in the dtype of the coverage output to avoid upcasting the map.
+    indices = np.flatnonzero(covs > covs.dtype.type(cov_threshold))
+    covs = covs[indices]
+    bboxes = bbox_array[4*class_idx:4*class_idx+4].reshape(4, -1)[:, indices].T
+    bboxes = bboxes.astype(np.float32)
+
+    # Grid cell centers of the surviving cells only.
+    gc_x = ((indices // grid_h) * stride + offset) / bbox_norm[0] * scale_w
+    gc_y = ((indices % grid_h) * stride + offset) / bbox_norm[1] * scale_h
+    bboxes[:, 0] = (gc_x - bboxes[:, 0]) * bbox_norm[0]
+    bboxes[:, 1] = (gc_y - bboxes[:, 1]) * bbox_norm[1]
+    bboxes[:, 2] = (bboxes[:, 2] + gc_x) * bbox_norm[0]
+    bboxes[:, 3] = (bboxes[:, 3] + gc_y) * bbox_norm[1]
+
+    # Clip to the model input and scale back to the frame size.
+    limits = np.array([model_width, model_height] * 2, dtype=np.float32)
+    scales = np.array(
+        [frame.width / model_width, frame.height / model_height] * 2,
+        dtype=np.float32
+    )
+    bboxes = np.minimum(np.maximum(bboxes, 0), limits) * scales
+    return covs, bboxes
+
+
 def render_image(frame, image_wise_bboxes, output_image_file, box_color, linewidth=3):
     """Render images with overlain outputs."""
     image = frame.load_image()
@@ -164,15 +233,43 @@ def return_bbox_info(frame, image_wise_bboxes):
     return final_annotations
 
 
+def _iou_kernel(rects, out):
+    """Fill out with the IOU between all pairs of rects without temporaries."""
+    n = rects.shape[0]
+    for i in prange(n):
+        l_i, t_i, r_i, b_i = rects[i, 0], rects[i, 1], rects[i, 2], rects[i, 3]
+        area_i = (r_i - l_i) * (b_i - t_i)
+        for j in range(n):
+            isect_w = max(0.0, min(r_i, rects[j, 2]) - max(l_i, rects[j, 0]))
+            isect_h = max(0.0, min(b_i, rects[j, 3]) - max(t_i, rects[j, 1]))
+            area_isect = isect_w * isect_h
+            area_j = (rects[j, 2] - rects[j, 0]) * (rects[j, 3] - rects[j, 1])
+            out[i, j] = area_isect / (area_i + area_j - area_isect + .01)
+
+
+if njit is not None:
+    _iou_kernel = njit(parallel=True, fastmath=True)(_iou_kernel)
+    # Compile at import so that the first request does not pay for the JIT.
+    _iou_kernel(np.zeros((1, 4)), np.empty((1, 1)))
+
+
 def iou_vectorized(rects):
     """
     Intersection over union among a list of rectangles in LTRB format.
 
+    Uses a parallel numba kernel when numba is installed.
+
     Args:
         rects (np.array) : numpy array of shape (N, 4), LTRB format, assumes L<R and T<B
     Returns::
         d (np.array) : numpy array of shape (N, N) of the IOU between all pairs of rects
     """
+    if njit is not None:
+        rects = np.ascontiguousarray(rects, dtype=np.float64)
+        out = np.empty((rects.shape[0], rects.shape[0]), dtype=np.float64)
+        _iou_kernel(rects, out)
+        return out
+
     # coordinates
     l, t, r, b = rects.T
 
@@ -198,6 +295,187 @@ def iou_vectorized(rects):
     return area_isect / (denom + .01)
 
 
+def dbscan_labels(bboxes, covs, eps, min_samples, groups=None, use_1d=False):
+    """
+    Cluster the candidate bboxes of a single class with DBSCAN.
+
+    Every bbox is represented by its row of the pairwise 1 - IOU matrix and
+    sklearn is run on these rows with the coverage values as sample weights.
+
+    Bboxes of several images can be passed at once with their image index as
+    groups. Every group is clustered on its own 1 - IOU matrix, so bboxes of
+    different groups never share a cluster.
+
+    Groups of fewer than SPARSE_CANDIDATES bboxes are clustered with
+    small_dbscan_labels, which gives the same labels without sklearn.
+
+    With use_1d, the bboxes are first clustered on their x-centers only with
+    the `dbscan1d` package, when it is installed. An image falls back to the
+    IOU clustering when one of its 1-D clusters is not also compact in y.
+
+    Args:
+        bboxes (np.array) : numpy array of shape (N, 4) of bboxes in LTRB format
+        covs (np.array) : numpy array of shape (N,) of coverage values
+        eps (float) : DBSCAN eps from the clustering config
+        min_samples (float) : DBSCAN min_samples from the clustering config
+        groups (np.array) : optional numpy array of shape (N,) of non negative group ids
+        use_1d (bool) : try 1-D clustering on the bbox x-centers first
+    Returns::
+        labeling (np.array) : numpy array of shape (N,) of cluster labels, -1 marks noise
+    """
+    bboxes = np.asarray(bboxes, dtype=np.float64)
+    if groups is None:
+        groups = np.zeros((bboxes.shape[0],), dtype=np.int64)
+    if use_1d and DBSCAN1D is not None:
+        labeling, pending = _dbscan_1d_labels(bboxes, covs, eps, min_samples, groups)
+    else:
+        labeling = np.full((bboxes.shape[0],), -1, dtype=np.int64)
+        pending = np.ones((bboxes.shape[0],), dtype=bool)
+    pending = np.flatnonzero(pending)
+    order = pending[np.argsort(groups[pending], kind="stable")]
+    _, starts, counts = np.unique(
+        groups[order], return_index=True, return_counts=True
+    )
+    for start, count in zip(starts, counts):
+        members = order[start:start + count]
+        if count < SPARSE_CANDIDATES:
+            group_labels = small_dbscan_labels(
+                bboxes[members], covs[members], eps, min_samples
+            )
+        else:
+            pairwise_dist = 1.0 * (1.0 - iou_vectorized(bboxes[members]))
+            group_labels = dbscan(eps=eps, min_samples=min_samples).fit_predict(
+                X=pairwise_dist,
+                sample_weight=covs[members]
+            )
+        # Number the clusters of every group after the previous ones.
+        labeling[members] = np.where(
+            group_labels >= 0, group_labels + labeling.max() + 1, -1
+        )
+    return labeling
+
+
+def small_dbscan_labels(bboxes, covs, eps, min_samples):
+    """
+    DBSCAN of a handful of bboxes in numpy, without the sklearn setup cost.
+
+    Uses the same features, metric and weighted core point rule as the sklearn
+    call in dbscan_labels: every bbox is its row of the 1 - IOU matrix, rows
+    within a euclidean distance of eps are neighbours, and a bbox is a core
+    point when the coverage of its neighbourhood sums to min_samples. Clusters
+    grow transitively over core points and a border bbox joins the first
+    cluster that reaches it, in the same order as sklearn.
+
+    Args:
+        bboxes (np.array) : numpy array of shape (N, 4) of bboxes in LTRB format
+        covs (np.array) : numpy array of shape (N,) of coverage values
+        eps (float) : DBSCAN eps from the clustering config
+        min_samples (float) : DBSCAN min_samples from the clustering config
+    Returns::
+        labeling (np.array) : numpy array of shape (N,) of cluster labels, -1 marks noise
+    """
+    rows = 1.0 - iou_vectorized(bboxes)
+    distances = np.sqrt(np.sum((rows[:, None, :] - rows[None, :, :]) ** 2, axis=-1))
+    neighbours = distances <= eps
+    is_core = neighbours.dot(np.asarray(covs, dtype=np.float64)) >= min_samples
+    labeling = np.full((bboxes.shape[0],), -1, dtype=np.int64)
+    label = 0
+    for seed in range(bboxes.shape[0]):
+        if labeling[seed] != -1 or not is_core[seed]:
+            continue
+        stack = [seed]
+        while stack:
+            idx = stack.pop()
+            if labeling[idx] != -1:
+                continue
+            labeling[idx] = label
+            if is_core[idx]:
+                stack.extend(np.flatnonzero(
+                    np.logical_and(neighbours[idx], labeling == -1)
+                ))
+        label += 1
+    return labeling
+
+
+def _dbscan_1d_labels(bboxes, covs, eps, min_samples, groups):
+    """
+    Cluster bboxes on their x-centers with a 1-D DBSCAN, one group at a time.
+
+    Shifting one of two equally sized w wide bboxes by d along x gives a
+    1 - IOU distance of 2d / (w + d), so the x-centers are scaled by the
+    median bbox width of their group and clustered with eps / (2 - eps).
+    A group whose clusters spread further than that in y, scaled by the
+    median bbox height, is not separable along x alone and is left to the
+    IOU clustering.
+
+    Returns::
+        labeling (np.array) : numpy array of shape (N,) of cluster labels, -1 marks noise
+        pending (np.array) : boolean numpy array of shape (N,) of the bboxes left unclustered
+    """
+    labeling = np.full((bboxes.shape[0],), -1, dtype=np.int64)
+    pending = np.zeros((bboxes.shape[0],), dtype=bool)
+    eps_1d = eps / (2.0 - eps)
+    num_labels = 0
+    for group in np.unique(groups):
+        members = np.flatnonzero(groups == group)
+        boxes = bboxes[members]
+        width = max(np.median(boxes[:, 2] - boxes[:, 0]), 1.0)
+        height = max(np.median(boxes[:, 3] - boxes[:, 1]), 1.0)
+        x_center = 0.5 * (boxes[:, 0] + boxes[:, 2]) / width
+        y_center = 0.5 * (boxes[:, 1] + boxes[:, 3]) / height
+        group_labels = DBSCAN1D(eps=eps_1d, min_samples=min_samples).fit_predict(
+            x_center, sample_weight=covs[members]
+        )
+        valid = np.flatnonzero(group_labels >= 0)
+        if valid.size == 0:
+            continue
+        _, group_labels = np.unique(group_labels[valid], return_inverse=True)
+        num_clusters = group_labels.max() + 1
+        y_min = np.full((num_clusters,), np.inf)
+        y_max = np.full((num_clusters,), -np.inf)
+        np.minimum.at(y_min, group_labels, y_center[valid])
+        np.maximum.at(y_max, group_labels, y_center[valid])
+        if np.any(y_max - y_min > eps_1d):
+            pending[members] = True
+            continue
+        labeling[members[valid]] = group_labels + num_labels
+        num_labels += num_clusters
+    return labeling, pending
+
+
+def cluster_statistics(labeling, covs, bboxes):
+    """
+    Aggregate the coverage weights and weighted mean bbox of every DBSCAN cluster.
+
+    Args:
+        labeling (np.array) : numpy array of shape (N,) of cluster labels, -1 marks noise
+        covs (np.array) : numpy array of shape (N,) of coverage values used as weights
+        bboxes (np.array) : numpy array of shape (N, 4) of bboxes in LTRB format
+    Returns::
+        aggregated_w (np.array) : numpy array of shape (K,) of the summed weights per cluster
+        mean_bbox (np.array) : numpy array of shape (K, 4) of the weighted mean bbox per cluster
+        members (np.array) : numpy array of shape (K,) of the index of one sample of each cluster
+    """
+    valid = labeling >= 0
+    if not np.any(valid):
+        return (np.zeros((0,), dtype=np.float64),
+                np.zeros((0, 4), dtype=np.float64),
+                np.zeros((0,), dtype=np.int64))
+
+    # Sort the samples by label once so that every cluster is a contiguous
+    # segment and can be reduced in a single pass.
+    order = np.flatnonzero(valid)
+    order = order[np.argsort(labeling[order], kind="stable")]
+    _, boundaries = np.unique(labeling[order], return_index=True)
+
+    w = covs[order].astype(np.float64)
+    aggregated_w = np.add.reduceat(w, boundaries)
+    mean_bbox = np.add.reduceat(
+        bboxes[order].astype(np.float64) * w[:, None], boundaries
+    ) / aggregated_w[:, None]
+    return aggregated_w, mean_bbox, order[boundaries]
+
+
 def plot_keypoints(results, image_filename, image_path, render_limbs=True):
     """Renders keypoints on input image
 
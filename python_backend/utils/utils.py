@@ -16,13 +16,9 @@ def render_image(frame, bboxes, output_image_file, outline_color='yellow', linew
     for bbox_info in bboxes:
         box = [value for key, value in bbox_info.items() if 'bbox' in key.lower()][0]
         if (box[2] - box[0]) >= 0 and (box[3] - box[1]) >= 0:
+            # The outline used to be redrawn linewidth more times on the same
+            # coordinates, which left the image unchanged.
             draw.rectangle(box, outline=outline_color)
-            for i in range(linewidth):
-                x1 = max(0, box[0] - i)
-                y1 = max(0, box[1] - i)
-                x2 = min(image.size[0], box[2] + i)
-                y2 = min(image.size[1], box[3] + i)
-                draw.rectangle(box, outline=outline_color)
     image.save(output_image_file)
 
 